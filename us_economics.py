@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from fredapi import Fred
+import pyarrow as pa
+import requests
+from requests.adapters import HTTPAdapter
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
+import warnings
+import json
+import time
+from pathlib import Path
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # ==========================================
 # 1. 配置与初始化
@@ -66,6 +71,11 @@ for cat, items in INDICATORS.items():
     for name, code in items.items():
         NAME_TO_CODE[name] = code
 
+# 预先展开的查找表，避免在计算/渲染路径上反复遍历嵌套的 INDICATORS
+LEVEL_CODES = frozenset(["UNRATE", "ICSA", "UMCSENT"])  # 按水平值而非同比增速观察的指标
+INVERSE_SET = frozenset(INVERSE_CODES)
+NAMES_BY_CAT = {cat: list(items.keys()) for cat, items in INDICATORS.items()}
+
 # === 升级：全指标深度解读百科 ===
 INDICATOR_EXPLANATIONS = {
     "就业 (Employment)": """
@@ -146,86 +156,192 @@ INDICATOR_EXPLANATIONS = {
 # ==========================================
 # 3. 数据获取与处理
 # ==========================================
-@st.cache_data(ttl=3600)
-def fetch_and_process_data(api_key, indicators, years):
+# 所有缓存共用的有效期 (秒)
+CACHE_TTL = 3600
+
+# 本地 Parquet 缓存：进程重启 (冷启动) 后直接读盘，跳过 FRED 请求
+# 目录相对于本脚本而非启动时的工作目录
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+def current_cache_epoch():
+    # 按 CACHE_TTL 对齐的时间窗口编号；内存缓存与 Parquet 缓存都以此为界，
+    # 保证数据自拉取起最多被使用 CACHE_TTL 秒
+    return int(time.time() // CACHE_TTL)
+
+def load_cached_raw(years, columns, cache_epoch):
+    data_path = CACHE_DIR / f"raw_df_{years}y.parquet"
+    meta_path = CACHE_DIR / f"raw_df_{years}y.json"
+    try:
+        meta = json.loads(meta_path.read_text())
+        if int(meta["ts"] // CACHE_TTL) == cache_epoch and meta["columns"] == columns:
+            return pd.read_parquet(data_path)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        # 缓存缺失或损坏时回退到网络拉取
+        pass
+    return None
+
+def save_cached_raw(df, years):
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        df.to_parquet(CACHE_DIR / f"raw_df_{years}y.parquet", compression='zstd')
+        meta = {"ts": time.time(), "columns": list(df.columns)}
+        (CACHE_DIR / f"raw_df_{years}y.json").write_text(json.dumps(meta, ensure_ascii=False))
+    except (OSError, ValueError, pa.ArrowException):
+        # 只读文件系统等情况下放弃落盘，不影响主流程
+        pass
+
+# 直接请求 FRED REST 接口 (JSON)，进程内共享一个连接池复用 keep-alive 连接
+FRED_OBSERVATIONS_URL = "https://api.stlouisfed.org/fred/series/observations"
+FRED_POOL_SIZE = 16
+
+@st.cache_resource
+def get_fred_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FRED_POOL_SIZE)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_fred_series(session, api_key, code, start_date):
+    params = {
+        "series_id": code,
+        "api_key": api_key,
+        "file_type": "json",
+        "observation_start": start_date.strftime("%Y-%m-%d"),
+    }
+    try:
+        resp = session.get(FRED_OBSERVATIONS_URL, params=params, timeout=30)
+    except requests.RequestException as e:
+        # requests 的异常信息包含完整 URL (含 api_key)，不能直接展示给用户
+        raise ValueError(f"网络错误 ({type(e).__name__})") from None
+    if not resp.ok:
+        try:
+            message = resp.json()["error_message"]
+        except (ValueError, KeyError):
+            message = f"HTTP {resp.status_code}"
+        raise ValueError(message)
+    observations = resp.json()["observations"]
+    # FRED 用 "." 表示缺失值
+    index = pd.to_datetime([obs["date"] for obs in observations])
+    values = pd.to_numeric([obs["value"] for obs in observations], errors="coerce")
+    return pd.Series(values, index=index, dtype=np.float64)
+
+@st.cache_data(ttl=CACHE_TTL)
+def fetch_and_process_data(api_key, indicators, years, cache_epoch):
     if not api_key:
         return None
-    fred = Fred(api_key=api_key)
-    start_date = datetime.now() - timedelta(days=years*365)
-    all_data = pd.DataFrame()
     flat_indicators = {}
     for category, items in indicators.items():
         for name, code in items.items():
             flat_indicators[name] = code
+
+    # 仅当缓存包含全部指标时使用，部分指标失败的结果下次会重新拉取
+    cached = load_cached_raw(years, list(flat_indicators), cache_epoch)
+    if cached is not None:
+        return cached
+
+    session = get_fred_session()
+    start_date = datetime.now() - timedelta(days=years*365)
+
+    def _one(name, code):
+        series = fetch_fred_series(session, api_key, code, start_date)
+        series.name = name
+        return series.resample('M').last()
+
+    # FRED 请求为纯 I/O，并发拉取；界面更新 (进度条/警告) 只在主线程进行
+    results = {}
     progress_bar = st.progress(0)
-    for i, (name, code) in enumerate(flat_indicators.items()):
-        try:
-            series = fred.get_series(code, observation_start=start_date)
-            series.name = name
-            series = series.resample('M').last()
-            all_data = pd.concat([all_data, series], axis=1)
-        except Exception as e:
-            st.warning(f"无法获取 {name} ({code}): {e}")
-        progress_bar.progress((i + 1) / len(flat_indicators))
+    with ThreadPoolExecutor(max_workers=min(FRED_POOL_SIZE, len(flat_indicators))) as ex:
+        futures = {ex.submit(_one, name, code): (name, code) for name, code in flat_indicators.items()}
+        for i, future in enumerate(as_completed(futures)):
+            name, code = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                st.warning(f"无法获取 {name} ({code}): {e}")
+            progress_bar.progress((i + 1) / len(flat_indicators))
     progress_bar.empty()
+    # 按指标定义顺序一次性拼接
+    series_list = [results[name] for name in flat_indicators if name in results]
+    all_data = pd.concat(series_list, axis=1, copy=False) if series_list else pd.DataFrame()
     if not all_data.empty:
         all_data.sort_index(inplace=True)
         all_data.index = pd.to_datetime(all_data.index)
+        save_cached_raw(all_data, years)
     return all_data
 
+def shift_rows(values, periods):
+    # 等价于 DataFrame.shift(periods)：整体下移，顶部补 NaN
+    shifted = np.full(values.shape, np.nan)
+    if periods < values.shape[0]:
+        shifted[periods:] = values[:-periods]
+    return shifted
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def calculate_quant_metrics(df, z_window):
-    metrics_df = pd.DataFrame(index=df.index)
-    for col in df.columns:
-        code = NAME_TO_CODE.get(col)
-        # 1. 市场视角 (Market View)
-        if code == "PAYEMS": 
-            metrics_df[f"{col}_Market"] = df[col].diff(1) 
-        elif code in ["UNRATE", "ICSA", "UMCSENT"]: 
-            metrics_df[f"{col}_Market"] = df[col]
-        else:
-            metrics_df[f"{col}_Market"] = df[col].pct_change(12) * 100
-        # 2. 动量视角 (Momentum for Heatmap) & 原始值 (for Radar)
-        series_filled = df[col].ffill()
-        if code in ["UNRATE", "ICSA", "UMCSENT"]:
-            # 对于雷达图，我们需要一个“越大越好”的排名
-            # 虽然这里计算的是yoy，但我们也保存一个用于排名的 raw_val
-            # 简单起见，我们直接保存填充后的原始值作为 _Raw，在雷达图逻辑中处理反向逻辑
-            metrics_df[f"{col}_Raw"] = series_filled
-            yoy = series_filled.diff(12)
-        else:
-            metrics_df[f"{col}_Raw"] = series_filled.pct_change(12) * 100
-            yoy = series_filled.pct_change(12) * 100
-            
-        if code in INVERSE_CODES:
-             yoy = -yoy 
-        metrics_df[f"{col}_Momentum"] = yoy
-        
-        # 3. Z-Score
-        rolling_mean = yoy.rolling(window=z_window).mean()
-        rolling_std = yoy.rolling(window=z_window).std()
-        if rolling_std.iloc[-1] == 0:
-            metrics_df[f"{col}_Z"] = 0
-        else:
-            metrics_df[f"{col}_Z"] = (yoy - rolling_mean) / rolling_std
-    return metrics_df
+    # 按指标类型生成列掩码，用 numpy 对整张二维数组做向量化变换 (会产生若干整表临时数组)，
+    # 不再逐列调用 pandas；结果在末尾一次性构建为 DataFrame
+    codes = [NAME_TO_CODE.get(col) for col in df.columns]
+    level_mask = np.array([code in LEVEL_CODES for code in codes], dtype=bool)
+    nfp_mask = np.array([code == "PAYEMS" for code in codes], dtype=bool)
+    inverse_mask = np.array([code in INVERSE_SET for code in codes], dtype=bool)
+
+    # 原始数据与中间计算 (同比/滚动统计) 均保持 float64，仅返回的派生指标降为 float32，
+    # 以减半缓存与图表序列化体积
+    values = df.to_numpy(dtype=np.float64)
+    filled = df.ffill().to_numpy(dtype=np.float64)
+    filled_lag = shift_rows(filled, 12)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yoy_pct = (filled / filled_lag - 1) * 100
+
+    # 1. 市场视角 (Market View)
+    market = np.where(level_mask, values, yoy_pct)
+    market[:, nfp_mask] = (values - shift_rows(values, 1))[:, nfp_mask]
+
+    # 2. 动量视角 (Momentum for Heatmap) & 原始值 (for Radar)
+    # 对于雷达图，我们需要一个“越大越好”的排名
+    # 水平类指标 (失业率等) 直接保存填充后的原始值作为 _Raw，在雷达图逻辑中处理反向逻辑
+    raw = np.where(level_mask, filled, yoy_pct)
+    yoy = np.where(level_mask, filled - filled_lag, yoy_pct)
+    yoy[:, inverse_mask] *= -1
+
+    # 3. Z-Score
+    # 整个二维数组只调用一次 pandas rolling (Cython 单遍 O(n) 累加器)
+    rolling = pd.DataFrame(yoy).rolling(window=z_window)
+    rolling_mean = rolling.mean().to_numpy()
+    rolling_std = rolling.std().to_numpy()
+    # 窗口内无波动 (std=0) 时 Z 值无定义，逐点置为 NaN
+    rolling_std[rolling_std == 0] = np.nan
+    z = (yoy - rolling_mean) / rolling_std
+
+    # 按 指标 x (Market, Raw, Momentum, Z) 交错排列列
+    stacked = np.stack([market, raw, yoy, z], axis=2).reshape(len(df.index), -1)
+    columns = [f"{col}_{kind}" for col in df.columns for kind in ("Market", "Raw", "Momentum", "Z")]
+    return pd.DataFrame(stacked.astype(np.float32), index=df.index, columns=columns)
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def to_csv_bytes(df):
+    # CSV 编码较慢，仅在数据变化时重新生成下载内容
+    return df.to_csv().encode('utf-8')
 
 # ==========================================
 # 4. 智能研报生成
 # ==========================================
-def generate_smart_report(category, df):
-    report_text = f"### 📝 {category} · 总结\n\n"
-    
-    # 获取该板块下指标的最新有效值
-    latest_vals = {}
-    indicators = INDICATORS[category]
-    
-    for name, code in indicators.items():
+def extract_latest_values(category, df):
+    # 获取该板块下指标的最新有效值和前值，返回 ((code, 最新值, 前值), ...) 元组作为研报缓存键
+    latest = []
+    for name, code in INDICATORS[category].items():
         col_name = f"{name}_Market"
         if col_name in df.columns:
             valid = df[col_name].dropna()
             if not valid.empty:
-                # 获取最新值和前值
-                latest_vals[code] = (valid.iloc[-1], valid.iloc[-2] if len(valid)>1 else 0)
+                latest.append((code, float(valid.iloc[-1]), float(valid.iloc[-2]) if len(valid)>1 else 0.0))
+    return tuple(latest)
+
+@st.cache_data(ttl=CACHE_TTL)
+def generate_smart_report(category, latest_tuple):
+    report_text = f"### 📝 {category} · 总结\n\n"
+    
+    latest_vals = {code: (v_now, v_prev) for code, v_now, v_prev in latest_tuple}
 
     # 辅助函数：计算环比/同比变动方向
     def get_trend_str(now, prev):
@@ -348,29 +464,177 @@ def generate_smart_report(category, df):
     return report_text
 
 # ==========================================
-# 5. 界面主逻辑
+# 5. 图表数据计算
+# ==========================================
+@st.cache_data(ttl=CACHE_TTL)
+def compute_radar_data(radar_indicators, raw_metrics):
+    radar_data = {}
+    # 计算历史分位数：排序一次，用二分查找代替整列布尔比较
+    for label, col_name in radar_indicators.items():
+        if f"{col_name}_Raw" in raw_metrics.columns:
+            series = raw_metrics[f"{col_name}_Raw"].dropna()
+            
+            if not series.empty:
+                # 针对反向指标 (失业率等)，如果要加入，需要反转排名
+                # 目前选取的全都是正向指标 (越大越好)，所以直接计算
+                arr = np.sort(series.to_numpy())
+                
+                # 计算当前值的百分位 (严格小于当前值的占比)
+                current_val = series.iloc[-1]
+                current_rank = np.searchsorted(arr, current_val, side='left') / arr.size * 100
+                
+                # 计算1年前值的百分位
+                if len(series) > 12:
+                    last_year_val = series.iloc[-13]
+                    last_year_rank = np.searchsorted(arr, last_year_val, side='left') / arr.size * 100
+                else:
+                    last_year_rank = 50 
+                    
+                radar_data[label] = (float(current_rank), float(last_year_rank))
+    return radar_data
+
+@st.cache_data(ttl=CACHE_TTL)
+def compute_heatmap(mom_df, years, hide_incomplete):
+    heatmap_raw = mom_df.tail(years * 12)
+    
+    if hide_incomplete:
+        if heatmap_raw.iloc[-1].isna().sum() > len(mom_df.columns) / 2:
+            heatmap_raw = heatmap_raw.iloc[:-1]
+
+    # 区间内标准化 (与 DataFrame.mean/std 一致：忽略 NaN，ddof=1)，转置为 指标 x 月份
+    arr = heatmap_raw.to_numpy(dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        z_array = ((arr - np.nanmean(arr, axis=0)) / np.nanstd(arr, axis=0, ddof=1)).T
+    
+    x_labels = heatmap_raw.index.strftime('%Y-%m').tolist()
+    y_labels = [c.replace('_Momentum', '') for c in heatmap_raw.columns]
+    return z_array, x_labels, y_labels
+
+# ==========================================
+# 6. 图表构建 (缓存 Figure 对象，数据未变时跳过 Plotly 组装)
+# ==========================================
+# 以下函数以 data_hash 及控件取值为缓存键；带下划线的参数为绘图数据，不参与哈希
+# plotly.express / make_subplots 导入较重，延迟到首次构建对应图表时再导入
+@st.cache_resource(ttl=CACHE_TTL)
+def build_nfp_figure(data_hash, _x, _y):
+    fig_nfp = go.Figure()
+    colors = np.where(_y < 0, '#ef553b', '#636efa')
+    fig_nfp.add_trace(go.Bar(
+        x=_x, y=_y, marker_color=colors, name="新增就业"
+    ))
+    fig_nfp.update_layout(title="非农就业人数 (每月新增 / 千人)", hovermode="x unified", height=350)
+    return fig_nfp
+
+@st.cache_resource(ttl=CACHE_TTL)
+def build_rate_figure(data_hash, _x, _unrate, _claims):
+    from plotly.subplots import make_subplots
+    fig_rate = make_subplots(specs=[[{"secondary_y": True}]])
+    if _unrate is not None:
+        fig_rate.add_trace(go.Scatter(x=_x, y=_unrate, name="失业率 (%)", line=dict(color='orange')), secondary_y=True)
+    if _claims is not None:
+        fig_rate.add_trace(go.Scatter(x=_x, y=_claims, name="初请失业金", line=dict(color='gray')), secondary_y=False)
+    fig_rate.update_layout(title="失业率 vs 初请失业金", hovermode="x unified", height=350)
+    return fig_rate
+
+@st.cache_resource(ttl=CACHE_TTL)
+def build_trend_figure(cat, data_hash, _x, _series):
+    from plotly.subplots import make_subplots
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    for name, values in _series:
+        on_secondary = "Rate" in name or "Sentiment" in name or "%" in name or "CPI" in name or "PCE" in name
+        fig.add_trace(go.Scatter(x=_x, y=values, name=name), secondary_y=on_secondary)
+    fig.update_layout(title=f"{cat} - 核心趋势 同比增速 (YoY %)", hovermode="x unified", height=450)
+    return fig
+
+@st.cache_resource(ttl=CACHE_TTL)
+def build_cycle_figure(cycle_years, data_hash, _cycle_df, growth_col, inflation_col):
+    import plotly.express as px
+    fig_cycle = px.scatter(
+        _cycle_df, x=growth_col, y=inflation_col, text='Date', color=_cycle_df.index,
+        title=f"经济路径 (过去 {cycle_years} 年)"
+    )
+    fig_cycle.add_hrect(y0=0, y1=6, fillcolor="red", opacity=0.05, annotation_text="滞胀/过热")
+    fig_cycle.add_hrect(y0=-6, y1=0, fillcolor="green", opacity=0.05, annotation_text="复苏/通缩")
+    fig_cycle.add_vline(x=0, line_dash="dash", line_color="gray")
+    fig_cycle.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig_cycle.update_traces(textposition='top center')
+    fig_cycle.update_layout(showlegend=False, height=600)
+    return fig_cycle
+
+@st.cache_resource(ttl=CACHE_TTL)
+def build_heat_figure(heatmap_years, hide_incomplete, data_hash, _z_array, _x_labels, _y_labels):
+    return go.Figure(go.Heatmap(
+        z=_z_array, x=_x_labels, y=_y_labels,
+        zmin=-3, zmax=3, colorscale="RdBu_r", colorbar_title="Z"
+    ))
+
+@st.cache_resource(ttl=CACHE_TTL)
+def build_radar_figure(data_hash, _radar_data):
+    categories = list(_radar_data.keys())
+    current_vals = [v[0] for v in _radar_data.values()]
+    last_year_vals = [v[1] for v in _radar_data.values()]
+    
+    # 闭合雷达图
+    categories.append(categories[0])
+    current_vals.append(current_vals[0])
+    last_year_vals.append(last_year_vals[0])
+
+    fig_radar = go.Figure()
+    
+    # 绘制当前状态 (红色)
+    fig_radar.add_trace(go.Scatterpolar(
+        r=current_vals, theta=categories,
+        fill='toself', name='当前 (Current)',
+        line_color='red',
+        customdata=last_year_vals,
+        hovertemplate="<b>%{theta}</b><br>当前: %{r:.1f}<br>1年前: %{customdata:.1f}<extra></extra>"
+    ))
+    
+    # 绘制1年前状态 (灰色)
+    fig_radar.add_trace(go.Scatterpolar(
+        r=last_year_vals, theta=categories,
+        fill='toself', name='1年前 (1 Year Ago)',
+        line_color='gray', opacity=0.5,
+        customdata=current_vals,
+        hovertemplate="<b>%{theta}</b><br>1年前: %{r:.1f}<br>当前: %{customdata:.1f}<extra></extra>"
+    ))
+
+    fig_radar.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100]),
+        ),
+        showlegend=True,
+        height=500,
+        title=" (0=历史最冷, 100=历史最热)"
+    )
+    return fig_radar
+
+# ==========================================
+# 7. 界面主逻辑
 # ==========================================
 
 if API_KEY:
-    raw_df = fetch_and_process_data(API_KEY, INDICATORS, lookback_years)
+    raw_df = fetch_and_process_data(API_KEY, INDICATORS, lookback_years, current_cache_epoch())
     
     if raw_df is not None and not raw_df.empty:
         quant_df = calculate_quant_metrics(raw_df, z_score_window)
+        # 数据指纹：数据刷新、回看年限或滚动窗口变化时失效图表缓存
+        data_hash = int(pd.util.hash_pandas_object(quant_df).sum())
         
         st.subheader("四大经济数据概览")
         st.caption("展示各板块核心代表指标的最新数值。就业看新增(人)，其他看同比增速(YoY%)。")
         
+        # 各板块首个指标的最新有效值：一次性求出各列最后有效日期，避免逐列 dropna
+        market_cols = {category: f"{names[0]}_Market" for category, names in NAMES_BY_CAT.items()}
+        present_cols = [c for c in market_cols.values() if c in quant_df.columns]
+        last_idx = quant_df[present_cols].apply(pd.Series.last_valid_index)
+        
         latest_metrics = {}
-        for category, items in INDICATORS.items():
-            first_metric = list(items.keys())[0]
-            try:
-                valid_series = quant_df[f"{first_metric}_Market"].dropna()
-                if not valid_series.empty:
-                    val = valid_series.iloc[-1]
-                    date = valid_series.index[-1]
-                    latest_metrics[category] = (val, date, first_metric)
-            except KeyError:
-                continue
+        for category, col in market_cols.items():
+            date = last_idx.get(col)
+            if pd.notna(date):
+                latest_metrics[category] = (quant_df.at[date, col], date, NAMES_BY_CAT[category][0])
 
         col1, col2, col3, col4 = st.columns(4)
         cols = [col1, col2, col3, col4]
@@ -410,47 +674,33 @@ if API_KEY:
             col_left, col_right = st.columns([2, 1])
             
             with col_left:
-                selected_cat = st.selectbox("选择分析板块", list(INDICATORS.keys()))
+                selected_cat = st.selectbox("选择分析板块", list(NAMES_BY_CAT))
                 
                 # 绘图逻辑
                 if selected_cat == "就业 (Employment)":
                     nfp_col = "非农就业人数 (Non-Farm Payrolls)"
                     if f"{nfp_col}_Market" in quant_df.columns:
                         nfp_data = quant_df[f"{nfp_col}_Market"].dropna()
-                        fig_nfp = go.Figure()
-                        colors = ['#ef553b' if v < 0 else '#636efa' for v in nfp_data.values]
-                        fig_nfp.add_trace(go.Bar(
-                            x=nfp_data.index, y=nfp_data.values, marker_color=colors, name="新增就业"
-                        ))
-                        fig_nfp.update_layout(title="非农就业人数 (每月新增 / 千人)", hovermode="x unified", height=350)
+                        fig_nfp = build_nfp_figure(data_hash, nfp_data.index, nfp_data.to_numpy())
                         st.plotly_chart(fig_nfp, use_container_width=True)
                     
-                    fig_rate = make_subplots(specs=[[{"secondary_y": True}]])
-                    ur_col = "失业率 (Unemployment Rate)"
-                    ic_col = "初请失业金 (Initial Claims)"
-                    if f"{ur_col}_Market" in quant_df.columns:
-                        fig_rate.add_trace(go.Scatter(x=quant_df.index, y=quant_df[f"{ur_col}_Market"], name="失业率 (%)", line=dict(color='orange')), secondary_y=True)
-                    if f"{ic_col}_Market" in quant_df.columns:
-                        fig_rate.add_trace(go.Scatter(x=quant_df.index, y=quant_df[f"{ic_col}_Market"], name="初请失业金", line=dict(color='gray')), secondary_y=False)
-                    fig_rate.update_layout(title="失业率 vs 初请失业金", hovermode="x unified", height=350)
+                    ur_col = "失业率 (Unemployment Rate)_Market"
+                    ic_col = "初请失业金 (Initial Claims)_Market"
+                    fig_rate = build_rate_figure(
+                        data_hash, quant_df.index,
+                        quant_df[ur_col].to_numpy() if ur_col in quant_df.columns else None,
+                        quant_df[ic_col].to_numpy() if ic_col in quant_df.columns else None
+                    )
                     st.plotly_chart(fig_rate, use_container_width=True)
 
                 else:
-                    fig = make_subplots(specs=[[{"secondary_y": True}]])
-                    has_secondary = False
-                    for name in INDICATORS[selected_cat].keys():
-                        series = quant_df[f"{name}_Market"]
-                        on_secondary = False
-                        if "Rate" in name or "Sentiment" in name or "%" in name or "CPI" in name or "PCE" in name:
-                             on_secondary = True
-                             has_secondary = True
-                        fig.add_trace(go.Scatter(x=series.index, y=series.values, name=name), secondary_y=on_secondary)
-                    fig.update_layout(title=f"{selected_cat} - 核心趋势 同比增速 (YoY %)", hovermode="x unified", height=450)
+                    trend_series = tuple((name, quant_df[f"{name}_Market"].to_numpy()) for name in NAMES_BY_CAT[selected_cat])
+                    fig = build_trend_figure(selected_cat, data_hash, quant_df.index, trend_series)
                     st.plotly_chart(fig, use_container_width=True)
 
                 
                 st.markdown("---")
-                smart_report = generate_smart_report(selected_cat, quant_df)
+                smart_report = generate_smart_report(selected_cat, extract_latest_values(selected_cat, quant_df))
                 st.info(smart_report)
 
         
@@ -472,16 +722,7 @@ if API_KEY:
                 cycle_df = quant_df[[growth_col, inflation_col]].dropna().tail(months_to_show).copy()
                 cycle_df['Date'] = cycle_df.index.strftime('%Y-%m')
                 
-                fig_cycle = px.scatter(
-                    cycle_df, x=growth_col, y=inflation_col, text='Date', color=cycle_df.index,
-                    title=f"经济路径 (过去 {cycle_years} 年)"
-                )
-                fig_cycle.add_hrect(y0=0, y1=6, fillcolor="red", opacity=0.05, annotation_text="滞胀/过热")
-                fig_cycle.add_hrect(y0=-6, y1=0, fillcolor="green", opacity=0.05, annotation_text="复苏/通缩")
-                fig_cycle.add_vline(x=0, line_dash="dash", line_color="gray")
-                fig_cycle.add_hline(y=0, line_dash="dash", line_color="gray")
-                fig_cycle.update_traces(textposition='top center')
-                fig_cycle.update_layout(showlegend=False, height=600)
+                fig_cycle = build_cycle_figure(cycle_years, data_hash, cycle_df, growth_col, inflation_col)
                 st.plotly_chart(fig_cycle, use_container_width=True)
                 
                 st.info("""
@@ -515,28 +756,9 @@ if API_KEY:
             mom_cols = [c for c in quant_df.columns if c.endswith("_Momentum")]
             
             if mom_cols:
-                months_to_show_heat = heatmap_years * 12
-                heatmap_raw = quant_df[mom_cols].tail(months_to_show_heat)
-                
-                if hide_incomplete:
-                    if heatmap_raw.iloc[-1].isna().sum() > len(mom_cols) / 2:
-                        heatmap_raw = heatmap_raw.iloc[:-1]
-
-                heatmap_z = (heatmap_raw - heatmap_raw.mean()) / heatmap_raw.std()
+                z_array, x_labels, y_labels = compute_heatmap(quant_df[mom_cols], heatmap_years, hide_incomplete)
                 
-                heatmap_data = heatmap_z.T
-                x_labels = pd.to_datetime(heatmap_data.columns).strftime('%Y-%m')
-                y_labels = heatmap_data.index.str.replace('_Momentum', '')
-                
-                fig_heat = px.imshow(
-                    heatmap_data,
-                    x=x_labels,
-                    y=y_labels,
-                    aspect="auto",
-                    color_continuous_scale="RdBu_r", 
-                    origin='lower',
-                    zmin=-3, zmax=3
-                )
+                fig_heat = build_heat_figure(heatmap_years, hide_incomplete, data_hash, z_array, x_labels, y_labels)
                 st.plotly_chart(fig_heat, use_container_width=True)
                 
                 st.success(f"""
@@ -569,67 +791,11 @@ if API_KEY:
                 "信心 (密歇根)": "消费者信心 (UMich Sentiment)"
             }
             
-            radar_data = {}
-            # 计算历史分位数 
-            for label, col_name in radar_indicators.items():
-                if f"{col_name}_Raw" in quant_df.columns:
-                    series = quant_df[f"{col_name}_Raw"].dropna()
-                    
-                    if not series.empty:
-                        # 针对反向指标 (失业率等)，如果要加入，需要反转排名
-                        # 目前选取的全都是正向指标 (越大越好)，所以直接计算
-                        
-                        # 计算当前值的百分位
-                        current_val = series.iloc[-1]
-                        current_rank = (series < current_val).mean() * 100
-                        
-                        # 计算1年前值的百分位
-                        if len(series) > 12:
-                            last_year_val = series.iloc[-13]
-                            last_year_rank = (series < last_year_val).mean() * 100
-                        else:
-                            last_year_rank = 50 
-                            
-                        radar_data[label] = (current_rank, last_year_rank)
+            raw_cols = [f"{col_name}_Raw" for col_name in radar_indicators.values() if f"{col_name}_Raw" in quant_df.columns]
+            radar_data = compute_radar_data(radar_indicators, quant_df[raw_cols])
 
             if radar_data:
-                categories = list(radar_data.keys())
-                current_vals = [v[0] for v in radar_data.values()]
-                last_year_vals = [v[1] for v in radar_data.values()]
-                
-                # 闭合雷达图
-                categories.append(categories[0])
-                current_vals.append(current_vals[0])
-                last_year_vals.append(last_year_vals[0])
-
-                fig_radar = go.Figure()
-                
-                # 绘制当前状态 (红色)
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=current_vals, theta=categories,
-                    fill='toself', name='当前 (Current)',
-                    line_color='red',
-                    customdata=last_year_vals,
-                    hovertemplate="<b>%{theta}</b><br>当前: %{r:.1f}<br>1年前: %{customdata:.1f}<extra></extra>"
-                ))
-                
-                # 绘制1年前状态 (灰色)
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=last_year_vals, theta=categories,
-                    fill='toself', name='1年前 (1 Year Ago)',
-                    line_color='gray', opacity=0.5,
-                    customdata=current_vals,
-                    hovertemplate="<b>%{theta}</b><br>1年前: %{r:.1f}<br>当前: %{customdata:.1f}<extra></extra>"
-                ))
-
-                fig_radar.update_layout(
-                    polar=dict(
-                        radialaxis=dict(visible=True, range=[0, 100]),
-                    ),
-                    showlegend=True,
-                    height=500,
-                    title=" (0=历史最冷, 100=历史最热)"
-                )
+                fig_radar = build_radar_figure(data_hash, radar_data)
                 
                 st.plotly_chart(fig_radar, use_container_width=True)
                 
@@ -652,13 +818,14 @@ if API_KEY:
             display_df = raw_df.sort_index(ascending=False).copy()
             display_df.index = display_df.index.strftime('%Y-%m-%d')
             
+            # 保持数值列为 float，缺失值仅在渲染时显示为 "-"
             st.dataframe(
-                display_df.fillna("-"),
+                display_df.style.format(na_rep="-", precision=2),
                 use_container_width=True,
                 height=500
             )
             
-            csv = display_df.to_csv().encode('utf-8')
+            csv = to_csv_bytes(display_df)
             st.download_button(
                 label="📥 下载 CSV 数据文件",
                 data=csv,